@@ -1,14 +1,26 @@
 import os
+import re
+import asyncio
 import logging
+import queue
+import shutil
+import tempfile
+import weakref
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import LRUCache, TTLCache
 from dotenv import load_dotenv
 import spotipy
 from spotipy.oauth2 import SpotifyClientCredentials
 import yt_dlp
 import requests
-from telegram import Update
-from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes
-import eyed3
-from eyed3.id3.frames import ImageFrame
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from telegram import InputFile, Update
+from telegram.error import TelegramError
+from telegram.request import HTTPXRequest
+from telegram.ext import AIORateLimiter, Application, CommandHandler, MessageHandler, filters, ContextTypes
+from mutagen.id3 import APIC, ID3, ID3NoHeaderError
 from io import BytesIO
 
 # Load environment variables
@@ -33,12 +45,210 @@ spotify = spotipy.Spotify(
     client_credentials_manager=SpotifyClientCredentials(
         client_id=SPOTIFY_CLIENT_ID,
         client_secret=SPOTIFY_CLIENT_SECRET
-    )
+    ),
+    requests_timeout=10,
+    retries=3
 )
 
+# Track metadata and search hits rarely change, so keep them for a day
+_TRACK_CACHE = TTLCache(maxsize=4096, ttl=86400)
+_SEARCH_CACHE = TTLCache(maxsize=4096, ttl=86400)
+_COVER_CACHE = TTLCache(maxsize=256, ttl=86400)
+
+# Shared HTTP session so repeated cover-art fetches reuse pooled connections
+HTTP = requests.Session()
+HTTP.mount('https://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504))
+))
+
 # Download directory
 DOWNLOAD_DIR = "downloads"
-os.makedirs(DOWNLOAD_DIR, exist_ok=True)
+
+# yt-dlp settings shared by every download; a link is always one video, even
+# when it also carries a playlist (e.g. watch?v=...&list=RD...)
+_YDL_OPTS_BASE = {
+    'quiet': True,
+    'noplaylist': True,
+    'concurrent_fragment_downloads': 4,
+    'http_chunk_size': 10485760,
+    'retries': 3,
+    'fragment_retries': 3,
+    'socket_timeout': 15,
+}
+
+# yt-dlp options: send the original audio container as-is, or convert to MP3 for tagging
+_YDL_OPTS_RAW = {
+    **_YDL_OPTS_BASE,
+    'format': 'bestaudio[ext=m4a]/bestaudio',
+}
+
+_YDL_OPTS_MP3 = {
+    **_YDL_OPTS_BASE,
+    'format': 'bestaudio/best',
+    'postprocessors': [{
+        'key': 'FFmpegExtractAudio',
+        'preferredcodec': 'mp3',
+        'preferredquality': '192',
+    }],
+}
+
+# Idle YoutubeDL instances keyed by "needs MP3"; building one loads every extractor,
+# so they are reused and each is only ever used by one worker thread at a time
+_YDL_POOLS = {False: queue.SimpleQueue(), True: queue.SimpleQueue()}
+
+# Worker pool for blocking yt-dlp calls, gated so queued jobs don't pile up in it
+MAX_DOWNLOADS = 4
+EXECUTOR = ThreadPoolExecutor(max_workers=MAX_DOWNLOADS)
+DOWNLOAD_SEMAPHORE = asyncio.Semaphore(MAX_DOWNLOADS)
+
+# Matches YouTube and Spotify track links in a message. Each match starts at a word
+# boundary and walks host labels, so long words without a link can't backtrack badly
+_URL_RE = re.compile(
+    r'(?<!\S)(?:https?://)?(?:[\w-]+\.)*'
+    r'(?:(?P<yt>youtube\.com|youtu\.be)|(?P<sp>spotify\.com/track))\S*'
+)
+
+# Per-chat locks so one user flooding links is served one request at a time;
+# a lock disappears once no handler holds or waits on it
+CHAT_LOCKS = weakref.WeakValueDictionary()
+
+def _chat_lock(chat_id):
+    """Return the lock for chat_id, creating it if no handler is using one."""
+    lock = CHAT_LOCKS.get(chat_id)
+    if lock is None:
+        lock = asyncio.Lock()
+        CHAT_LOCKS[chat_id] = lock
+    return lock
+
+# Pulls the video id out of the common YouTube URL shapes
+_VIDEO_ID_RE = re.compile(r'(?:[?&]v=|youtu\.be/|shorts/|embed/)([\w-]{11})')
+
+class _DownloadCache(LRUCache):
+    """LRU of finished downloads that deletes a file's directory once it is evicted."""
+
+    def popitem(self):
+        key, value = super().popitem()
+        file_path = value[0]
+        asyncio.get_running_loop().run_in_executor(
+            None, shutil.rmtree, os.path.dirname(file_path), True
+        )
+        return key, value
+
+# Finished downloads, and downloads in progress that later requests can join
+_DOWNLOAD_CACHE = _DownloadCache(maxsize=200)
+_INFLIGHT = {}
+
+# Telegram file_ids of tracks already uploaded, resent instead of the bytes. Keyed
+# like _DOWNLOAD_CACHE, so each Spotify track resends its own upload and tags
+_FILE_ID_CACHE = LRUCache(maxsize=4096)
+
+class StatusBus:
+    """One status message shared by several jobs, edited at most once per interval.
+
+    Each job owns a line of the message. Updates only record the new text; a
+    background task sends the latest state, so intermediate states may be skipped.
+    """
+
+    # Telegram rejects messages longer than 4096 characters
+    MAX_LENGTH = 4096
+    MAX_LINE_LENGTH = 200
+
+    def __init__(self, interval=1.0):
+        self.interval = interval
+        self.message = None
+        self.lines = []
+        self.sent_text = None
+        self.dirty = False
+        self.task = None
+        self.last_sent = float('-inf')
+
+    def line(self, text):
+        """Add a line for one job and return the handle used to update it."""
+        self.lines.append(text)
+        return StatusLine(self, len(self.lines) - 1)
+
+    def render(self):
+        if len(self.lines) == 1:
+            return self.lines[0][:self.MAX_LENGTH]
+        
+        # Label lines by position rather than repeating each link
+        labelled = [f"#{i} {text}"[:self.MAX_LINE_LENGTH] for i, text in enumerate(self.lines, 1)]
+        text = "\n".join(labelled)
+        if len(text) <= self.MAX_LENGTH:
+            return text
+        
+        # Too many to list: summarise, then show the unfinished jobs that still fit
+        done = sum(line.startswith("✅") for line in self.lines)
+        failed = sum(line.startswith("❌") for line in self.lines)
+        pending = len(self.lines) - done - failed
+        shown = [f"✅ {done} done / ❌ {failed} failed / ⏳ {pending} pending"]
+        length = len(shown[0])
+        for line, label in zip(self.lines, labelled):
+            if line.startswith(("✅", "❌")):
+                continue
+            length += len(label) + 1
+            if length > self.MAX_LENGTH:
+                break
+            shown.append(label)
+        return "\n".join(shown)
+
+    async def send(self, update):
+        """Post the status message with its current lines."""
+        self.sent_text = self.render()
+        self.message = await update.message.reply_text(self.sent_text)
+
+    async def update(self, index, text):
+        if self.lines[index] == text:
+            return
+        self.lines[index] = text
+        self.dirty = True
+        if self.task is None:
+            self.task = asyncio.create_task(self._flush())
+
+    async def _flush(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while self.dirty:
+                delay = self.last_sent + self.interval - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    
+                self.dirty = False
+                text = self.render()
+                # Telegram rejects edits that don't change the message
+                if text == self.sent_text:
+                    continue
+                    
+                self.last_sent = loop.time()
+                try:
+                    await self.message.edit_text(text)
+                    self.sent_text = text
+                except TelegramError as e:
+                    logger.warning(f"Error updating status message: {e}")
+        finally:
+            self.task = None
+
+class StatusLine:
+    """One job's line in a StatusBus message."""
+
+    def __init__(self, bus, index):
+        self.bus = bus
+        self.index = index
+
+    async def set(self, text):
+        await self.bus.update(self.index, text)
+
+async def _show_status(update, status, text):
+    """Show text on the given status line, or on a new status message if there is none."""
+    if status is None:
+        bus = StatusBus()
+        status = bus.line(text)
+        await bus.send(update)
+    else:
+        await status.set(text)
+    return status
 
 # Command handlers
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -70,7 +280,8 @@ async def download_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -
 
     url = context.args[0]
     if "youtube.com" in url or "youtu.be" in url:
-        await download_from_youtube(update, url)
+        async with _chat_lock(update.effective_chat.id):
+            await download_from_youtube(update, url)
     else:
         await update.message.reply_text("Please provide a valid YouTube URL.")
 
@@ -82,113 +293,262 @@ async def spotify_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
     url = context.args[0]
     if "spotify.com" in url:
-        await get_spotify_info(update, url)
+        async with _chat_lock(update.effective_chat.id):
+            await get_spotify_info(update, url)
     else:
         await update.message.reply_text("Please provide a valid Spotify URL.")
 
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle messages with links."""
-    text = update.message.text
-
-    if "youtube.com" in text or "youtu.be" in text:
-        # Extract URL (simple version for clarity)
-        words = text.split()
-        for word in words:
-            if "youtube.com" in word or "youtu.be" in word:
-                await download_from_youtube(update, word)
-                return
-
-    elif "spotify.com/track" in text:
-        # Extract URL (simple version for clarity)
-        words = text.split()
-        for word in words:
-            if "spotify.com/track" in word:
-                await get_spotify_info(update, word)
-                return
+    matches = list(_URL_RE.finditer(update.message.text))
 
-    else:
+    if not matches:
         await update.message.reply_text(
             "Please send a YouTube or Spotify link. Use /help for more information."
         )
+        return
+
+    # One status message for the whole batch, with a line per link
+    bus = StatusBus()
+    lines = [bus.line("⏳ Queued") for match in matches]
+    await bus.send(update)
+
+    # Several links in one message are handled side by side, a few at a time
+    semaphore = asyncio.Semaphore(MAX_DOWNLOADS)
+    async with _chat_lock(update.effective_chat.id):
+        async with asyncio.TaskGroup() as tg:
+            for match, status in zip(matches, lines):
+                tg.create_task(_dispatch_link(update, match, status, semaphore))
 
-async def download_from_youtube(update: Update, url: str, metadata=None) -> None:
+async def _dispatch_link(update: Update, match: re.Match, status: StatusLine, semaphore: asyncio.Semaphore) -> None:
+    """Handle one link found in a message."""
+    # A failure here must not make the TaskGroup cancel the other links
+    try:
+        async with semaphore:
+            if match.group('yt'):
+                await download_from_youtube(update, match.group(0), status=status)
+            else:
+                await get_spotify_info(update, match.group(0), status)
+    except Exception as e:
+        logger.error(f"Error handling link {match.group(0)}: {e}")
+
+async def download_from_youtube(update: Update, url: str, metadata=None, status=None) -> None:
     """Download audio from YouTube with optional metadata."""
-    status_message = await update.message.reply_text("⏳ Downloading audio from YouTube...")
+    key = _download_key(url, metadata)
+    
+    # Telegram already has this track, so resend it without uploading anything
+    if await _send_file_id(update, key, metadata, status):
+        return
+    
+    status = await _show_status(update, status, "⏳ Downloading audio from YouTube...")
     
     try:
-        # Set options for yt-dlp
-        ydl_opts = {
-            'format': 'bestaudio/best',
-            'postprocessors': [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'mp3',
-                'preferredquality': '192',
-            }],
-            'outtmpl': f'{DOWNLOAD_DIR}/%(title)s.%(ext)s',
-            'quiet': True,
-        }
+        file_path, title, duration = await _get_download(key, url, metadata)
+        if metadata:
+            title = metadata['title']  # Use the title from Spotify
         
-        # Download the file
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=True)
-            title = info.get('title', 'Unknown Title')
-            file_path = f"{DOWNLOAD_DIR}/{title}.mp3"
-            
-            # Add ID3 tags if metadata is available
-            if metadata:
-                await add_id3_tags(file_path, metadata)
-                title = metadata['title']  # Use the title from Spotify
+        # A request sharing this download may have finished uploading it meanwhile
+        if await _send_file_id(update, key, metadata, status):
+            return
+        
+        # Send the file
+        await status.set(f"✅ Downloaded: {title}")
+        audio = await asyncio.to_thread(open, file_path, 'rb')
+        with audio:
+            # Let the HTTP client stream the handle instead of buffering the whole MP3
+            sent = await update.message.reply_audio(
+                audio=InputFile(audio, filename=f"{title}{os.path.splitext(file_path)[1]}", read_file_handle=False),
+                title=title,
+                performer=metadata.get('artist') if metadata else None,
+                duration=duration
+            )
+        # Telegram only treats MP3/M4A as audio; anything else comes back as a document
+        if sent.audio:
+            _FILE_ID_CACHE[key] = sent.audio.file_id
             
-            # Send the file
-            await status_message.edit_text(f"✅ Downloaded: {title}")
-            with open(file_path, 'rb') as audio:
-                await update.message.reply_audio(audio, title=title)
-                
-            # Clean up
-            os.remove(file_path)
+            # Later requests resend the file_id, so the local copy is no longer needed.
+            # pop() bypasses _DownloadCache.popitem, so remove the directory here
+            cached = _DOWNLOAD_CACHE.pop(key, None)
+            if cached is not None:
+                await asyncio.to_thread(shutil.rmtree, os.path.dirname(cached[0]), True)
             
     except Exception as e:
         logger.error(f"Error downloading from YouTube: {e}")
-        await status_message.edit_text(f"❌ Error downloading audio: {str(e)}")
+        await status.set(f"❌ Error downloading audio: {str(e)}")
+
+async def _send_file_id(update, key, metadata, status):
+    """Resend a track Telegram already stores; return whether that worked."""
+    file_id = _FILE_ID_CACHE.get(key)
+    if file_id is None:
+        return False
+    
+    try:
+        await update.message.reply_audio(audio=file_id)
+    except TelegramError as e:
+        logger.warning(f"Cached file_id rejected, uploading again: {e}")
+        _FILE_ID_CACHE.pop(key, None)
+        return False
+    
+    if status is not None:
+        await status.set(f"✅ Sent: {metadata['title']}" if metadata else "✅ Sent")
+    return True
 
-async def add_id3_tags(file_path, metadata):
-    """Add ID3 tags to the MP3 file."""
+def _download_key(url, metadata):
+    """Key a download by video id (or URL) and the Spotify track its tags come from."""
+    match = _VIDEO_ID_RE.search(url)
+    # Different Spotify tracks can resolve to the same video but need their own tags
+    track_id = metadata['track_id'] if metadata else None
+    return (match.group(1) if match else url, track_id)
+
+async def _get_download(key, url, metadata):
+    """Return (file_path, title, duration) for url, downloading it at most once."""
+    cached = _DOWNLOAD_CACHE.get(key)
+    if cached is not None:
+        return cached
+    
+    # Join a download of the same video that is already running
+    task = _INFLIGHT.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_download_and_cache(key, url, metadata))
+        _INFLIGHT[key] = task
+        task.add_done_callback(lambda _: _INFLIGHT.pop(key, None))
+    return await asyncio.shield(task)
+
+async def _download_and_cache(key, url, metadata):
+    """Download url into its own directory, tag it, and remember the result."""
+    # Each download gets its own directory so concurrent ones never share a file name
+    tmp_dir = await asyncio.to_thread(tempfile.mkdtemp, prefix='dl_', dir=DOWNLOAD_DIR)
+    
     try:
-        audiofile = eyed3.load(file_path)
+        # Have ffmpeg write the text tags during the MP3 conversion itself
+        postprocessor_args = {'extractaudio': _ffmpeg_metadata_args(metadata)} if metadata else {}
         
-        # Create ID3 tag if it doesn't exist
-        if audiofile.tag is None:
-            audiofile.initTag()
+        # Download the file in the worker pool, only transcoding to MP3 when we need ID3 tags
+        async with DOWNLOAD_SEMAPHORE:
+            result = await asyncio.get_running_loop().run_in_executor(
+                EXECUTOR, _ytdlp_download, url, bool(metadata), tmp_dir, postprocessor_args
+            )
+            
+        # Cover art is the only tag ffmpeg can't add in that pass
+        if metadata and metadata.get('cover_bytes'):
+            await add_cover_art(result[0], metadata['cover_bytes'])
+            
+    except Exception:
+        await asyncio.to_thread(shutil.rmtree, tmp_dir, True)
+        raise
+    
+    _DOWNLOAD_CACHE[key] = result
+    return result
+
+@contextmanager
+def _borrow_ydl(mp3):
+    """Take an idle YoutubeDL from the pool, building one if none is free."""
+    pool = _YDL_POOLS[mp3]
+    try:
+        ydl = pool.get_nowait()
+    except queue.Empty:
+        ydl = yt_dlp.YoutubeDL(dict(_YDL_OPTS_MP3 if mp3 else _YDL_OPTS_RAW))
+    try:
+        yield ydl
+    finally:
+        pool.put(ydl)
+
+def _ytdlp_download(url, mp3, out_dir, postprocessor_args):
+    """Blocking worker: download url with yt-dlp and return (file_path, title, duration)."""
+    with _borrow_ydl(mp3) as ydl:
+        # Point the reused instance at this request's directory and tags
+        ydl.params['outtmpl']['default'] = f'{out_dir}/%(id)s.%(ext)s'
+        ydl.params['postprocessor_args'] = postprocessor_args
         
-        # Set basic tags
-        audiofile.tag.title = metadata.get('title', 'Unknown Title')
-        audiofile.tag.artist = metadata.get('artist', 'Unknown Artist')
-        audiofile.tag.album = metadata.get('album', 'Unknown Album')
-        audiofile.tag.album_artist = metadata.get('album_artist', metadata.get('artist', 'Unknown Artist'))
+        info = ydl.extract_info(url, download=True)
+        title = info.get('title', 'Unknown Title')
+        # yt-dlp sanitizes the file name, so ask it where the file actually went
+        file_path = ydl.prepare_filename(info)
+        if mp3:
+            file_path = os.path.splitext(file_path)[0] + '.mp3'
+        requested = info.get('requested_downloads') or [{}]
+        file_path = requested[0].get('filepath', file_path)
+        # Only keep what the upload needs; the full info dict is large
+        return file_path, title, int(info.get('duration') or 0)
+
+def _ytdlp_search(query):
+    """Blocking worker: return the URL of the top YouTube result for query, or None."""
+    with _borrow_ydl(False) as ydl:
+        # Unprocessed results are flat metadata, so no formats are resolved here
+        info = ydl.extract_info(f"ytsearch1:{query}", download=False, process=False)
+        entry = next(iter(info.get('entries') or []), None)
+        return entry.get('url') if entry else None
+
+def _ffmpeg_metadata_args(metadata):
+    """Build ffmpeg -metadata arguments for the ID3 tags we know from Spotify."""
+    tags = {
+        'title': metadata.get('title', 'Unknown Title'),
+        'artist': metadata.get('artist', 'Unknown Artist'),
+        'album': metadata.get('album', 'Unknown Album'),
+        'album_artist': metadata.get('album_artist', metadata.get('artist', 'Unknown Artist')),
+    }
+    
+    if 'year' in metadata:
+        tags['date'] = metadata['year']
         
-        if 'year' in metadata:
-            audiofile.tag.recording_date = metadata['year']
-            
-        if 'track_number' in metadata:
-            audiofile.tag.track_num = metadata['track_number']
+    if 'track_number' in metadata:
+        tags['track'] = metadata['track_number']
+        
+    args = ['-id3v2_version', '3']
+    for name, value in tags.items():
+        args += ['-metadata', f'{name}={value}']
+    return args
+
+async def add_cover_art(file_path, cover_bytes):
+    """Embed the cover image into the MP3 file without blocking the event loop."""
+    await asyncio.to_thread(_apply_cover_art, file_path, cover_bytes)
+
+def _apply_cover_art(file_path, cover_bytes):
+    """Blocking worker for add_cover_art: add the image to the file's existing tag."""
+    try:
+        # Only the ID3 header is read here, not the audio frames
+        try:
+            tags = ID3(file_path)
+        except ID3NoHeaderError:
+            tags = ID3()
             
-        # Add cover art if available
-        if 'cover_url' in metadata and metadata['cover_url']:
-            response = requests.get(metadata['cover_url'])
-            if response.status_code == 200:
-                image_data = response.content
-                audiofile.tag.images.set(ImageFrame.FRONT_COVER, image_data, 'image/jpeg')
-                
-        # Save the changes
-        audiofile.tag.save()
+        tags.add(APIC(encoding=3, mime='image/jpeg', type=3, desc='Cover', data=cover_bytes))
+        tags.save(file_path, v2_version=3)
         
     except Exception as e:
-        logger.error(f"Error adding ID3 tags: {e}")
-        # Continue without ID3 tags if there's an error
+        logger.error(f"Error adding cover art: {e}")
+        # Continue without cover art if there's an error
+
+async def get_cover(image_url):
+    """Return the cover image bytes for image_url, served from cache when possible."""
+    cover_bytes = _COVER_CACHE.get(image_url)
+    if cover_bytes is None:
+        cover_bytes = await asyncio.to_thread(_fetch_cover, image_url)
+        if cover_bytes:
+            _COVER_CACHE[image_url] = cover_bytes
+    return cover_bytes
+
+def _fetch_cover(image_url):
+    """Blocking worker for get_cover: download the image, or None if that fails."""
+    try:
+        response = HTTP.get(image_url, timeout=10)
+        if response.status_code == 200:
+            return response.content
+    except Exception as e:
+        logger.error(f"Error fetching cover art: {e}")
+    return None
+
+async def get_track(track_id):
+    """Return Spotify track info, served from cache when possible."""
+    track_info = _TRACK_CACHE.get(track_id)
+    if track_info is None:
+        track_info = await asyncio.to_thread(spotify.track, track_id)
+        _TRACK_CACHE[track_id] = track_info
+    return track_info
 
-async def get_spotify_info(update: Update, url: str) -> None:
+async def get_spotify_info(update: Update, url: str, status=None) -> None:
     """Get track info from Spotify and download from YouTube."""
-    status_message = await update.message.reply_text("🔍 Fetching info from Spotify...")
+    status = await _show_status(update, status, "🔍 Fetching info from Spotify...")
     
     try:
         # Extract track ID from URL
@@ -196,20 +556,20 @@ async def get_spotify_info(update: Update, url: str) -> None:
             track_id = url.split("/track/")[1].split("?")[0]
             
             # Get track info
-            track_info = spotify.track(track_id)
+            track_info = await get_track(track_id)
             
             # Extract important details
             title = track_info["name"]
-            artists = [artist["name"] for artist in track_info["artists"]]
-            artist_names = ", ".join(artists)
+            artist_names = ", ".join(artist["name"] for artist in track_info["artists"])
             album = track_info["album"]["name"]
-            album_artist = ", ".join([artist["name"] for artist in track_info["album"]["artists"]])
+            album_artist = ", ".join(artist["name"] for artist in track_info["album"]["artists"])
             release_date = track_info["album"]["release_date"]
             duration_ms = track_info["duration_ms"]
             duration = f"{duration_ms//60000}:{(duration_ms//1000)%60:02d}"
             
             # Cover image
             image_url = track_info["album"]["images"][0]["url"] if track_info["album"]["images"] else None
+            cover_bytes = await get_cover(image_url) if image_url else None
             
             # Track number
             track_number = track_info.get("track_number", 1)
@@ -219,11 +579,12 @@ async def get_spotify_info(update: Update, url: str) -> None:
             
             # Prepare metadata for ID3 tags
             metadata = {
+                'track_id': track_id,
                 'title': title,
                 'artist': artist_names,
                 'album': album,
                 'album_artist': album_artist,
-                'cover_url': image_url,
+                'cover_bytes': cover_bytes,
                 'track_number': track_number
             }
             
@@ -240,62 +601,106 @@ async def get_spotify_info(update: Update, url: str) -> None:
                 f"Downloading this track with ID3 tags..."
             )
             
-            if image_url:
+            # Upload the bytes we already have so Telegram doesn't fetch the image again
+            if cover_bytes:
+                photo = InputFile(BytesIO(cover_bytes), filename="cover.jpg")
+                await update.message.reply_photo(photo, caption=info_message, parse_mode="Markdown")
+            elif image_url:
                 await update.message.reply_photo(image_url, caption=info_message, parse_mode="Markdown")
             else:
-                await status_message.edit_text(info_message, parse_mode="Markdown")
+                await update.message.reply_text(info_message, parse_mode="Markdown")
             
             # Search and download from YouTube
             search_query = f"{title} {artist_names} audio"
-            await search_and_download_from_youtube(update, search_query, metadata)
+            await search_and_download_from_youtube(update, search_query, metadata, status)
         else:
-            await status_message.edit_text("Please provide a valid Spotify track URL.")
+            await status.set("❌ Please provide a valid Spotify track URL.")
             
     except Exception as e:
         logger.error(f"Error getting Spotify info: {e}")
-        await status_message.edit_text(f"❌ Error fetching Spotify info: {str(e)}")
+        await status.set(f"❌ Error fetching Spotify info: {str(e)}")
 
-async def search_and_download_from_youtube(update: Update, query: str, metadata=None) -> None:
+async def search_and_download_from_youtube(update: Update, query: str, metadata=None, status=None) -> None:
     """Search for a track on YouTube and download it."""
+    status = await _show_status(update, status, "🔍 Searching YouTube...")
+    
     try:
         # Search YouTube for the track
-        ydl_opts = {
-            'format': 'bestaudio/best',
-            'postprocessors': [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'mp3',
-                'preferredquality': '192',
-            }],
-            'outtmpl': f'{DOWNLOAD_DIR}/%(title)s.%(ext)s',
-            'quiet': True,
-            'default_search': 'ytsearch',
-            'max_downloads': 1,
-        }
-        
-        # Get video info first
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(f"ytsearch:{query}", download=False)
-            entries = info.get('entries', [])
-            
-            if not entries:
-                await update.message.reply_text("❌ No matching tracks found on YouTube.")
-                return
-                
-            # Get the first result
-            video_info = entries[0]
-            video_url = video_info.get('webpage_url')
+        video_url = _SEARCH_CACHE.get(query)
+        if video_url is None:
+            async with DOWNLOAD_SEMAPHORE:
+                video_url = await asyncio.get_running_loop().run_in_executor(
+                    EXECUTOR, _ytdlp_search, query
+                )
+            if video_url:
+                _SEARCH_CACHE[query] = video_url
             
-            # Download the audio
-            await download_from_youtube(update, video_url, metadata)
+        if not video_url:
+            await status.set("❌ No matching tracks found on YouTube.")
+            return
+        
+        # Download the audio
+        await download_from_youtube(update, video_url, metadata, status)
             
     except Exception as e:
         logger.error(f"Error searching/downloading from YouTube: {e}")
-        await update.message.reply_text(f"❌ Error downloading track: {str(e)}")
+        await status.set(f"❌ Error downloading track: {str(e)}")
+
+def _prepare_download_dir():
+    """Create the download directory and clear leftovers from previous runs."""
+    os.makedirs(DOWNLOAD_DIR, exist_ok=True)
+    
+    # Per-request directories left behind by a crash or hard restart
+    with os.scandir(DOWNLOAD_DIR) as entries:
+        for entry in entries:
+            if entry.is_dir() and entry.name.startswith('dl_'):
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+async def post_init(application: Application) -> None:
+    """Prepare the download directory and warm up the Spotify token."""
+    await asyncio.to_thread(_prepare_download_dir)
+    
+    # Fetch the token now so the first user request doesn't pay for it
+    try:
+        await asyncio.to_thread(spotify.search, 'a', limit=1)
+    except Exception as e:
+        logger.warning(f"Spotify warm-up failed: {e}")
 
 def main() -> None:
     """Start the bot."""
-    # Create the Application
-    application = Application.builder().token(TOKEN).build()
+    # Create the Application, throttling outbound calls to stay under Telegram's flood limits
+    rate_limiter = AIORateLimiter(
+        overall_max_rate=28,
+        overall_time_period=1,
+        group_max_rate=18,
+        group_time_period=60,
+        max_retries=3
+    )
+    
+    # Multiplex Bot API calls over HTTP/2 with a large connection pool. Uploads get
+    # their own write timeout (media_write_timeout), long enough for 10-20 MB tracks;
+    # long polling keeps its own small connection pool
+    request = HTTPXRequest(
+        connection_pool_size=64,
+        connect_timeout=10,
+        read_timeout=30,
+        write_timeout=60,
+        media_write_timeout=60,
+        pool_timeout=5,
+        http_version='2'
+    )
+    get_updates_request = HTTPXRequest(connection_pool_size=1, http_version='2')
+    
+    application = (
+        Application.builder()
+        .token(TOKEN)
+        .request(request)
+        .get_updates_request(get_updates_request)
+        .rate_limiter(rate_limiter)
+        .concurrent_updates(True)
+        .post_init(post_init)
+        .build()
+    )
 
     # Register command handlers
     application.add_handler(CommandHandler("start", start))